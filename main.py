@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import inspect
 import os
 import re
 import shutil
 import subprocess
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
+from cachetools import TLRUCache
 from dotenv import load_dotenv
 import psycopg
+from psycopg.abc import Query
+from psycopg.conninfo import make_conninfo
 from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg.sql import SQL, Identifier, Literal
+from psycopg_pool import AsyncConnectionPool
 
 from mcp.server.fastmcp import FastMCP
 
@@ -22,16 +31,50 @@ mcp = FastMCP("LocalNotes+Postgres+FileSystem+Git", host="0.0.0.0", port=8000)
 BASE_DIR = Path(__file__).resolve().parent
 NOTES_FILE = BASE_DIR / "notes.txt"
 
+# Long-lived O_APPEND descriptor shared by add_note. Each note goes straight to the
+# OS with one write(), so an acknowledged note survives the process being killed;
+# only the per-call open/close is saved. The descriptor is reopened whenever
+# notes.txt has been deleted or replaced (cleared, rotated) since it was opened.
+_notes_fd: Optional[int] = None
+_notes_lock = threading.Lock()
+
+def _close_notes() -> None:
+    global _notes_fd
+    with _notes_lock:
+        if _notes_fd is not None:
+            os.close(_notes_fd)
+            _notes_fd = None
+
+atexit.register(_close_notes)
+
+def _notes_fd_current() -> bool:
+    """True if _notes_fd still refers to the file at NOTES_FILE. Caller must hold _notes_lock."""
+    try:
+        on_disk = NOTES_FILE.stat()
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(_notes_fd)
+    return (opened.st_ino, opened.st_dev) == (on_disk.st_ino, on_disk.st_dev)
+
 @mcp.tool()
 def add_note(content: str) -> str:
     """Append one note line to notes.txt (normalized newline)."""
+    global _notes_fd
     note = (content or "").strip()
     if not note:
         return "Error: content is empty"
 
-    NOTES_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with NOTES_FILE.open("a", encoding="utf-8", newline="\n") as f:
-        f.write(note + "\n")
+    line = note.encode("utf-8") + b"\n"
+    with _notes_lock:
+        if _notes_fd is not None and not _notes_fd_current():
+            os.close(_notes_fd)
+            _notes_fd = None
+        if _notes_fd is None:
+            NOTES_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _notes_fd = os.open(NOTES_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        view = memoryview(line)
+        while view:
+            view = view[os.write(_notes_fd, view):]
     return f"OK: appended to {NOTES_FILE}"
 
 @mcp.tool()
@@ -40,9 +83,13 @@ def read_notes(max_chars: int = 20000) -> str:
     if not NOTES_FILE.exists():
         return f"Error: file not found: {NOTES_FILE}"
 
-    data = NOTES_FILE.read_text(encoding="utf-8")
+    # Text-mode read decodes incrementally and stops after max_chars + 1 characters,
+    # so neither the rest of the file nor a worst-case 4-bytes-per-char prefix is decoded
+    with NOTES_FILE.open("r", encoding="utf-8", errors="ignore", newline="") as f:
+        data = f.read(max_chars + 1)
     if len(data) > max_chars:
-        return data[:max_chars] + f"\n\n[TRUNCATED: {max_chars} of {len(data)} chars]"
+        size = NOTES_FILE.stat().st_size
+        return data[:max_chars] + f"\n\n[TRUNCATED: {max_chars} chars of {size} bytes]"
     return data
 
 
@@ -576,7 +623,8 @@ def git_config_set(repo_path: str, key: str, value: str, global_config: bool = F
 # -----------------------------
 # Postgres connection setup
 # -----------------------------
-load_dotenv(BASE_DIR / ".env")
+if os.getenv("NOTES_MCP_SKIP_DOTENV") != "1":
+    load_dotenv(BASE_DIR / ".env")
 
 def _env(name: str, default: Optional[str] = None) -> str:
     v = os.getenv(name, default)
@@ -595,52 +643,223 @@ PGSSLMODE = os.getenv("PGSSLMODE", "prefer")
 # Optional: limit dangerous tools
 ENABLE_DANGEROUS = os.getenv("ENABLE_DANGEROUS", "false").lower() == "true"
 
-# Pool for concurrency + performance
-POOL = ConnectionPool(
-    conninfo=f"host={PGHOST} port={PGPORT} dbname={PGDATABASE} user={PGUSER} password={PGPASSWORD} sslmode={PGSSLMODE}",
-    min_size=1,
-    max_size=5,
+# Plain (unquoted) identifier accepted by the create_* tools
+_IDENT_RE = re.compile(r'\A[A-Za-z_][A-Za-z0-9_]*\Z')
+
+# Optional comment hint for servers with a result-cache extension (e.g.
+# "/*+ result_cache(ttl=30) */"); plain servers ignore it as a comment.
+PG_RESULT_CACHE_HINT = os.getenv("PG_RESULT_CACHE_HINT", "")
+
+def _with_result_cache_hint(sql: str) -> str:
+    """Prefix a collector-stats query with PG_RESULT_CACHE_HINT, if configured."""
+    return f"{PG_RESULT_CACHE_HINT}\n{sql}" if PG_RESULT_CACHE_HINT else sql
+
+# How long dashboard-style stats tools (vacuum stats, cache hit ratio, activity
+# summary, slowest queries) reuse their last result; 0 disables.
+PG_STATS_CACHE_SECONDS = float(os.getenv("PG_STATS_CACHE_SECONDS", "10"))
+
+PGAPPNAME = os.getenv("PGAPPNAME", "psql-mcp-server")
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "15000"))
+PG_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv("PG_IDLE_IN_TRANSACTION_TIMEOUT_MS", "30000"))
+
+# Built once; make_conninfo validates the parameters and quotes values containing spaces.
+# TCP keepalives detect dead sockets, so pool checkouts skip a SELECT 1 probe (check=None)
+CONNINFO = make_conninfo(
+    host=PGHOST,
+    port=PGPORT,
+    dbname=PGDATABASE,
+    user=PGUSER,
+    password=PGPASSWORD,
+    sslmode=PGSSLMODE,
+    keepalives=1,
+    keepalives_idle=30,
+    keepalives_interval=10,
+    keepalives_count=3,
+    # Identify the server in pg_stat_activity and stop a runaway statement or an
+    # abandoned transaction from holding a pool slot indefinitely
+    application_name=PGAPPNAME,
+    options=(
+        f"-c statement_timeout={PG_STATEMENT_TIMEOUT_MS}"
+        f" -c idle_in_transaction_session_timeout={PG_IDLE_IN_TRANSACTION_TIMEOUT_MS}"
+    ),
+)
+
+# Pool sizing: connections above PG_POOL_MIN are closed after PG_POOL_MAX_IDLE seconds
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "2"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "20"))
+PG_POOL_MAX_IDLE = float(os.getenv("PG_POOL_MAX_IDLE", "300"))
+PG_POOL_MAX_LIFETIME = float(os.getenv("PG_POOL_MAX_LIFETIME", "3600"))
+
+# Pool for concurrency + performance (opened lazily on the running event loop)
+POOL = AsyncConnectionPool(
+    conninfo=CONNINFO,
+    check=None,
+    min_size=PG_POOL_MIN,
+    max_size=PG_POOL_MAX,
+    max_idle=PG_POOL_MAX_IDLE,
+    max_lifetime=PG_POOL_MAX_LIFETIME,
+    num_workers=2,
     kwargs={"row_factory": dict_row},
+    open=False,
 )
 
-def _fetch_all(sql: str, params: Optional[Tuple[Any, ...]] = None) -> List[Dict[str, Any]]:
-    with POOL.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            rows = cur.fetchall()
-            return list(rows)
-
-def _fetch_one(sql: str, params: Optional[Tuple[Any, ...]] = None) -> Dict[str, Any]:
-    with POOL.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            row = cur.fetchone()
-            return dict(row) if row else {}
-
-def _execute(sql: str, params: Optional[Tuple[Any, ...]] = None) -> str:
+async def _ensure_pool() -> None:
+    if POOL.closed:
+        await POOL.open()
+
+# Short-lived cache for catalog listings that change on human timescales.
+# Cleared whenever _execute/_execute_autocommit succeed (DDL, DML, grants).
+# Entries are (ttl, result); each expires ttl seconds after insertion, and the
+# size bound keeps free-form arguments (patterns, names) from growing it forever.
+_CACHE: TLRUCache = TLRUCache(maxsize=1024, ttu=lambda _key, entry, now: now + entry[0], timer=time.monotonic)
+
+def _ttl_cache(seconds: float) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache an async tool's result for `seconds`, keyed on tool name and arguments."""
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            hit = _CACHE.get(key)
+            if hit is not None:
+                return hit[1]
+            result = await fn(*args, **kwargs)
+            _CACHE[key] = (seconds, result)
+            return result
+        return wrapper
+    return decorator
+
+def _dangerous(action: str) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Replace a write tool with an error stub unless ENABLE_DANGEROUS was set at import."""
+    message = f"Error: {action} ENABLE_DANGEROUS=true in environment"
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        if ENABLE_DANGEROUS:
+            return fn
+        @functools.wraps(fn)
+        async def disabled(*args: Any, **kwargs: Any) -> str:
+            return message
+        return disabled
+    return decorator
+
+def _required_str(*names: str, hint: str = "") -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Strip the named string arguments and return an "Error: ... required" message if any is empty."""
+    if len(names) == 1:
+        missing = f"{names[0]} is"
+    elif len(names) == 2:
+        missing = f"{names[0]} and {names[1]} are"
+    else:
+        missing = f"{', '.join(names[:-1])}, and {names[-1]} are"
+    message = f"Error: {missing} required" + (f" ({hint})" if hint else "")
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        sig = inspect.signature(fn)
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = sig.bind(*args, **kwargs)
+            for name in names:
+                value = (bound.arguments.get(name) or "").strip()
+                if not value:
+                    return message
+                bound.arguments[name] = value
+            return await fn(*bound.args, **bound.kwargs)
+        return wrapper
+    return decorator
+
+# Tool SQL is fixed text, so it is prepared server-side on first use (skips parse/plan
+# on repeat calls). Pass prepare=False for ad-hoc or non-preparable statements.
+async def _fetch_all(sql: Query, params: Optional[Tuple[Any, ...]] = None, prepare: bool = True) -> List[Dict[str, Any]]:
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params, prepare=prepare)
+            return await cur.fetchall()
+
+async def _fetch_one(sql: Query, params: Optional[Tuple[Any, ...]] = None, prepare: bool = True) -> Dict[str, Any]:
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params, prepare=prepare)
+            row = await cur.fetchone()
+            return row if row is not None else {}
+
+async def _fetch_many(queries: List[Tuple[Query, Optional[Tuple[Any, ...]]]]) -> List[List[Dict[str, Any]]]:
+    """Run independent queries on one connection in pipeline mode (single round-trip)."""
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.pipeline():
+            cursors = [await conn.execute(sql, params, prepare=True) for sql, params in queries]
+        return [await cur.fetchall() for cur in cursors]
+
+async def _copy_out(sql: Query, lift_timeout: bool = False) -> Tuple[str, int]:
+    """Run a COPY ... TO STDOUT and return its text output and row count.
+
+    lift_timeout drops statement_timeout for this transaction (full-table dumps).
+    """
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.cursor() as cur:
+            if lift_timeout:
+                await cur.execute("SET LOCAL statement_timeout = 0")
+            chunks = []
+            async with cur.copy(sql) as copy:
+                async for data in copy:
+                    chunks.append(data)
+            return b"".join(chunks).decode(conn.info.encoding), cur.rowcount
+
+async def _execute(sql: Query, params: Optional[Tuple[Any, ...]] = None) -> str:
     """Execute a query and return status message."""
-    with POOL.connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, params or ())
-            conn.commit()
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(sql, params)
+            await conn.commit()
+            _CACHE.clear()
             return f"OK: executed successfully, rows affected: {cur.rowcount}"
 
-def _execute_autocommit(sql: str) -> str:
-    """Execute a query with autocommit (for database operations)."""
-    with POOL.connection() as conn:
-        conn.autocommit = True
-        with conn.cursor() as cur:
-            cur.execute(sql)
-            return f"OK: executed successfully"
+async def _execute_long(sql: Query, params: Optional[Tuple[Any, ...]] = None) -> str:
+    """Like _execute, but lifts statement_timeout for this transaction (DDL, DML, maintenance)."""
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SET LOCAL statement_timeout = 0")
+            await cur.execute(sql, params)
+            await conn.commit()
+            _CACHE.clear()
+            return f"OK: executed successfully, rows affected: {cur.rowcount}"
+
+async def _execute_autocommit(*statements: Query) -> str:
+    """Execute statements back-to-back on one autocommit connection (database operations, VACUUM).
+
+    SET LOCAL has no effect outside a transaction, so statement_timeout is lifted for
+    the session and reset to the connection default before it goes back to the pool.
+    """
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        await conn.set_autocommit(True)
+        try:
+            async with conn.cursor() as cur:
+                await cur.execute("SET statement_timeout = 0")
+                for sql in statements:
+                    await cur.execute(sql)
+                _CACHE.clear()
+                return f"OK: executed successfully"
+        finally:
+            # Hand the connection back to the pool with its default timeout, in transactional mode
+            await conn.execute("RESET statement_timeout")
+            await conn.set_autocommit(False)
+
+async def _server_version() -> int:
+    """Server version number (e.g. 160002), read from a pooled connection without a query."""
+    await _ensure_pool()
+    async with POOL.connection() as conn:
+        return conn.info.server_version
 
 
 # -----------------------------
 # Basic Postgres "admin" tools
 # -----------------------------
 @mcp.tool()
-def pg_health() -> Dict[str, Any]:
+async def pg_health() -> Dict[str, Any]:
     """Basic connectivity + identity check."""
-    row = _fetch_one(
+    row = await _fetch_one(
         """
         SELECT
           now()                           AS server_time,
@@ -654,9 +873,10 @@ def pg_health() -> Dict[str, Any]:
     return row
 
 @mcp.tool()
-def pg_list_schemas() -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_schemas() -> List[Dict[str, Any]]:
     """List non-system schemas."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT nspname AS schema
         FROM pg_namespace
@@ -665,148 +885,144 @@ def pg_list_schemas() -> List[Dict[str, Any]]:
         """
     )
 
+_LIST_TABLES_SQL = """
+    SELECT tablename AS table
+    FROM pg_catalog.pg_tables
+    WHERE schemaname = %s
+    ORDER BY 1
+"""
+
 @mcp.tool()
-def pg_list_tables(schema: str = "public") -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_tables(schema: str = "public") -> List[Dict[str, Any]]:
     """List tables in a schema."""
     schema = (schema or "public").strip()
-    return _fetch_all(
-        """
-        SELECT tablename AS table
-        FROM pg_catalog.pg_tables
-        WHERE schemaname = %s
-        ORDER BY 1
-        """,
-        (schema,),
-    )
+    return await _fetch_all(_LIST_TABLES_SQL, (schema,))
+
+_DESCRIBE_TABLE_SQL = """
+    SELECT
+      column_name,
+      data_type,
+      is_nullable,
+      column_default
+    FROM information_schema.columns
+    WHERE table_schema = %s AND table_name = %s
+    ORDER BY ordinal_position
+"""
 
 @mcp.tool()
-def pg_describe_table(schema: str, table: str) -> List[Dict[str, Any]]:
+async def pg_describe_table(schema: str, table: str) -> List[Dict[str, Any]]:
     """Describe columns (name, type, nullable, default)."""
     schema = (schema or "").strip()
     table = (table or "").strip()
     if not schema or not table:
         return [{"error": "schema and table are required"}]
 
-    return _fetch_all(
-        """
-        SELECT
-          column_name,
-          data_type,
-          is_nullable,
-          column_default
-        FROM information_schema.columns
-        WHERE table_schema = %s AND table_name = %s
-        ORDER BY ordinal_position
-        """,
-        (schema, table),
-    )
+    return await _fetch_all(_DESCRIBE_TABLE_SQL, (schema, table))
 
 @mcp.tool()
-def pg_show_setting(name: str) -> Dict[str, Any]:
+@_ttl_cache(30)
+async def pg_show_setting(name: str) -> Dict[str, Any]:
     """Show a single server setting."""
     name = (name or "").strip()
     if not name:
         return {"error": "setting name required"}
-    return _fetch_one("SELECT name, setting, unit, context, source FROM pg_settings WHERE name = %s", (name,))
+    return await _fetch_one("SELECT name, setting, unit, context, source FROM pg_settings WHERE name = %s", (name,))
 
 
 # -----------------------------
 # Database Operations
 # -----------------------------
 @mcp.tool()
-def pg_list_databases() -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_databases() -> List[Dict[str, Any]]:
     """List all non-template databases with size information."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT 
-          datname AS database,
-          pg_size_pretty(pg_database_size(datname)) AS size,
-          pg_database_size(datname) AS size_bytes,
-          (SELECT count(*) FROM pg_stat_activity WHERE datname = d.datname) AS connections
+          d.datname AS database,
+          pg_size_pretty(pg_database_size(d.datname)) AS size,
+          pg_database_size(d.datname) AS size_bytes,
+          COALESCE(a.conns, 0) AS connections
         FROM pg_database d
+        LEFT JOIN (SELECT datname, count(*) AS conns FROM pg_stat_activity GROUP BY datname) a
+          ON a.datname = d.datname
         WHERE datistemplate = false
-        ORDER BY pg_database_size(datname) DESC
+        ORDER BY pg_database_size(d.datname) DESC
         """
     )
 
 @mcp.tool()
-def pg_database_stats(database: str = None) -> Dict[str, Any]:
+async def pg_database_stats(database: str = None) -> Dict[str, Any]:
     """Get detailed statistics for current or specified database."""
     db = database or PGDATABASE
-    return _fetch_one(
+    return await _fetch_one(
         """
         SELECT 
-          datname AS database,
-          pg_size_pretty(pg_database_size(datname)) AS size,
-          pg_database_size(datname) AS size_bytes,
-          (SELECT count(*) FROM pg_stat_activity WHERE datname = d.datname) AS active_connections,
+          d.datname AS database,
+          pg_size_pretty(pg_database_size(d.datname)) AS size,
+          pg_database_size(d.datname) AS size_bytes,
+          COALESCE(a.conns, 0) AS active_connections,
           datconnlimit AS connection_limit,
           age(datfrozenxid) AS transaction_age
         FROM pg_database d
-        WHERE datname = %s
+        LEFT JOIN (SELECT datname, count(*) AS conns FROM pg_stat_activity GROUP BY datname) a
+          ON a.datname = d.datname
+        WHERE d.datname = %s
         """,
         (db,)
     )
 
 @mcp.tool()
-def pg_create_database(database: str, owner: str = None, encoding: str = "UTF8") -> str:
+@_dangerous("Database creation requires")
+@_required_str("database")
+async def pg_create_database(database: str, owner: str = None, encoding: str = "UTF8") -> str:
     """
     Create a new database.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Database creation requires ENABLE_DANGEROUS=true in environment"
-    
-    database = (database or "").strip()
-    if not database:
-        return "Error: database name is required"
-    
     # Validate database name (alphanumeric and underscore only)
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', database):
+    if not _IDENT_RE.match(database):
         return "Error: invalid database name (use alphanumeric and underscore only)"
     
     try:
-        sql = f'CREATE DATABASE "{database}"'
+        sql = SQL("CREATE DATABASE {}").format(Identifier(database))
         if owner:
-            sql += f' OWNER "{owner}"'
-        sql += f" ENCODING '{encoding}'"
+            sql += SQL(" OWNER {}").format(Identifier(owner))
+        sql += SQL(" ENCODING {}").format(Literal(encoding))
         
-        return _execute_autocommit(sql)
+        return await _execute_autocommit(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_drop_database(database: str, force: bool = False) -> str:
+@_dangerous("Database deletion requires")
+@_required_str("database")
+async def pg_drop_database(database: str, force: bool = False) -> str:
     """
     Drop a database.
     Requires ENABLE_DANGEROUS=true in environment.
     Set force=true to terminate connections before dropping.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Database deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    database = (database or "").strip()
-    if not database:
-        return "Error: database name is required"
-    
     # Safety check - don't drop current database
     if database == PGDATABASE:
         return "Error: cannot drop the current database"
     
     try:
-        if force:
-            # Terminate all connections first
-            _execute(
-                """
-                SELECT pg_terminate_backend(pid)
-                FROM pg_stat_activity
-                WHERE datname = %s AND pid != pg_backend_pid()
-                """,
-                (database,)
-            )
+        sql = SQL("DROP DATABASE {}").format(Identifier(database))
+        if not force:
+            return await _execute_autocommit(sql)
         
-        sql = f'DROP DATABASE "{database}"'
-        return _execute_autocommit(sql)
+        # PostgreSQL 13+ terminates the other sessions and drops in one command
+        if await _server_version() >= 130000:
+            return await _execute_autocommit(sql + SQL(" WITH (FORCE)"))
+        
+        # Older servers: terminate then drop on the same connection, back-to-back
+        terminate = SQL(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity"
+            " WHERE datname = {} AND pid <> pg_backend_pid()"
+        ).format(Literal(database))
+        return await _execute_autocommit(terminate, sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -815,54 +1031,44 @@ def pg_drop_database(database: str, force: bool = False) -> str:
 # Schema Management
 # -----------------------------
 @mcp.tool()
-def pg_create_schema(schema: str, authorization: str = None) -> str:
+@_dangerous("Schema creation requires")
+@_required_str("schema")
+async def pg_create_schema(schema: str, authorization: str = None) -> str:
     """
     Create a new schema.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Schema creation requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    if not schema:
-        return "Error: schema name is required"
-    
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', schema):
+    if not _IDENT_RE.match(schema):
         return "Error: invalid schema name"
     
     try:
-        sql = f'CREATE SCHEMA "{schema}"'
+        sql = SQL("CREATE SCHEMA {}").format(Identifier(schema))
         if authorization:
-            sql += f' AUTHORIZATION "{authorization}"'
+            sql += SQL(" AUTHORIZATION {}").format(Identifier(authorization))
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_drop_schema(schema: str, cascade: bool = False) -> str:
+@_dangerous("Schema deletion requires")
+@_required_str("schema")
+async def pg_drop_schema(schema: str, cascade: bool = False) -> str:
     """
     Drop a schema.
     Requires ENABLE_DANGEROUS=true in environment.
     Set cascade=true to drop all contained objects.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Schema deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    if not schema:
-        return "Error: schema name is required"
-    
     # Safety check
     if schema in ('public', 'pg_catalog', 'information_schema'):
         return f"Error: cannot drop system schema '{schema}'"
     
     try:
-        sql = f'DROP SCHEMA "{schema}"'
-        if cascade:
-            sql += ' CASCADE'
+        sql = SQL("DROP SCHEMA {}{}").format(
+            Identifier(schema), SQL(" CASCADE") if cascade else SQL("")
+        )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -871,143 +1077,113 @@ def pg_drop_schema(schema: str, cascade: bool = False) -> str:
 # Table Operations & Statistics
 # -----------------------------
 @mcp.tool()
-def pg_table_size(schema: str = "public", table: str = None) -> List[Dict[str, Any]]:
+async def pg_table_size(schema: str = "public", table: str = None) -> List[Dict[str, Any]]:
     """Get size information for tables in a schema."""
     schema = (schema or "public").strip()
+    table = (table or "").strip() or None
     
-    if table:
-        table = table.strip()
-        return _fetch_all(
-            """
-            SELECT
-              schemaname AS schema,
-              tablename AS table,
-              pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) AS total_size,
-              pg_size_pretty(pg_relation_size(schemaname||'.'||tablename)) AS table_size,
-              pg_size_pretty(pg_indexes_size(schemaname||'.'||tablename)) AS indexes_size,
-              pg_total_relation_size(schemaname||'.'||tablename) AS total_bytes
-            FROM pg_tables
-            WHERE schemaname = %s AND tablename = %s
-            """,
-            (schema, table)
-        )
-    else:
-        return _fetch_all(
-            """
-            SELECT
-              schemaname AS schema,
-              tablename AS table,
-              pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) AS total_size,
-              pg_size_pretty(pg_relation_size(schemaname||'.'||tablename)) AS table_size,
-              pg_size_pretty(pg_indexes_size(schemaname||'.'||tablename)) AS indexes_size,
-              pg_total_relation_size(schemaname||'.'||tablename) AS total_bytes
-            FROM pg_tables
-            WHERE schemaname = %s
-            ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
-            """,
-            (schema,)
-        )
+    # One statement for both cases so a single prepared plan is reused
+    return await _fetch_all(
+        """
+        SELECT
+          schemaname AS schema,
+          tablename AS table,
+          pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) AS total_size,
+          pg_size_pretty(pg_relation_size(schemaname||'.'||tablename)) AS table_size,
+          pg_size_pretty(pg_indexes_size(schemaname||'.'||tablename)) AS indexes_size,
+          pg_total_relation_size(schemaname||'.'||tablename) AS total_bytes
+        FROM pg_tables
+        WHERE schemaname = %s AND (%s::text IS NULL OR tablename = %s)
+        ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
+        """,
+        (schema, table, table)
+    )
 
-@mcp.tool()
-def pg_table_stats(schema: str, table: str) -> Dict[str, Any]:
+_TABLE_STATS_SQL = """
+    SELECT
+      schemaname AS schema,
+      relname AS table,
+      n_live_tup AS live_rows,
+      n_dead_tup AS dead_rows,
+      n_tup_ins AS inserts,
+      n_tup_upd AS updates,
+      n_tup_del AS deletes,
+      last_vacuum,
+      last_autovacuum,
+      last_analyze,
+      last_autoanalyze
+    FROM pg_stat_user_tables
+    WHERE schemaname = %s AND relname = %s
+"""
+
+@mcp.tool()
+async def pg_table_stats(schema: str, table: str) -> Dict[str, Any]:
     """Get detailed statistics for a specific table."""
     schema = (schema or "").strip()
     table = (table or "").strip()
     if not schema or not table:
         return {"error": "schema and table are required"}
     
-    return _fetch_one(
-        """
-        SELECT
-          schemaname AS schema,
-          relname AS table,
-          n_live_tup AS live_rows,
-          n_dead_tup AS dead_rows,
-          n_tup_ins AS inserts,
-          n_tup_upd AS updates,
-          n_tup_del AS deletes,
-          last_vacuum,
-          last_autovacuum,
-          last_analyze,
-          last_autoanalyze
-        FROM pg_stat_user_tables
-        WHERE schemaname = %s AND relname = %s
-        """,
-        (schema, table)
-    )
+    return await _fetch_one(_TABLE_STATS_SQL, (schema, table))
+
+_BLOAT_CHECK_SQL = _with_result_cache_hint("""
+    SELECT
+      schemaname AS schema,
+      relname AS table,
+      pg_size_pretty(pg_total_relation_size(relid)) AS size,
+      n_dead_tup AS dead_rows,
+      n_live_tup AS live_rows,
+      ROUND(n_dead_tup * 100.0 / NULLIF(n_live_tup + n_dead_tup, 0), 2) AS dead_ratio
+    FROM pg_stat_user_tables
+    WHERE schemaname = %s AND n_dead_tup > 0
+    ORDER BY n_dead_tup DESC
+    LIMIT 20
+""")
 
 @mcp.tool()
-def pg_bloat_check(schema: str = "public") -> List[Dict[str, Any]]:
+async def pg_bloat_check(schema: str = "public") -> List[Dict[str, Any]]:
     """Check for table bloat in a schema."""
     schema = (schema or "public").strip()
-    return _fetch_all(
-        """
-        SELECT
-          schemaname AS schema,
-          tablename AS table,
-          pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) AS size,
-          n_dead_tup AS dead_rows,
-          n_live_tup AS live_rows,
-          ROUND(n_dead_tup * 100.0 / NULLIF(n_live_tup + n_dead_tup, 0), 2) AS dead_ratio
-        FROM pg_stat_user_tables
-        WHERE schemaname = %s AND n_dead_tup > 0
-        ORDER BY n_dead_tup DESC
-        LIMIT 20
-        """,
-        (schema,)
-    )
+    return await _fetch_all(_BLOAT_CHECK_SQL, (schema,))
 
 @mcp.tool()
-def pg_create_table(schema: str, table: str, columns: str) -> str:
+@_dangerous("Table creation requires")
+@_required_str("schema", "table", "columns")
+async def pg_create_table(schema: str, table: str, columns: str) -> str:
     """
     Create a new table.
     Requires ENABLE_DANGEROUS=true in environment.
     
     Example columns: "id SERIAL PRIMARY KEY, name VARCHAR(100), created_at TIMESTAMP DEFAULT NOW()"
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Table creation requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    columns = (columns or "").strip()
-    
-    if not schema or not table or not columns:
-        return "Error: schema, table, and columns are required"
-    
     try:
-        sql = f'CREATE TABLE "{schema}"."{table}" ({columns})'
-        return _execute(sql)
+        sql = SQL("CREATE TABLE {} ({})").format(Identifier(schema, table), SQL(columns))
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_drop_table(schema: str, table: str, cascade: bool = False) -> str:
+@_dangerous("Table deletion requires")
+@_required_str("schema", "table")
+async def pg_drop_table(schema: str, table: str, cascade: bool = False) -> str:
     """
     Drop a table.
     Requires ENABLE_DANGEROUS=true in environment.
     Set cascade=true to drop dependent objects.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Table deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    
-    if not schema or not table:
-        return "Error: schema and table are required"
-    
     try:
-        sql = f'DROP TABLE "{schema}"."{table}"'
-        if cascade:
-            sql += ' CASCADE'
+        sql = SQL("DROP TABLE {}{}").format(
+            Identifier(schema, table), SQL(" CASCADE") if cascade else SQL("")
+        )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_alter_table(schema: str, table: str, alteration: str) -> str:
+@_dangerous("Table alteration requires")
+@_required_str("schema", "table", "alteration")
+async def pg_alter_table(schema: str, table: str, alteration: str) -> str:
     """
     Alter a table.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1018,45 +1194,28 @@ def pg_alter_table(schema: str, table: str, alteration: str) -> str:
     - "RENAME COLUMN old_name TO new_name"
     - "ALTER COLUMN id TYPE BIGINT"
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Table alteration requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    alteration = (alteration or "").strip()
-    
-    if not schema or not table or not alteration:
-        return "Error: schema, table, and alteration are required"
-    
     try:
-        sql = f'ALTER TABLE "{schema}"."{table}" {alteration}'
-        return _execute(sql)
+        sql = SQL("ALTER TABLE {} {}").format(Identifier(schema, table), SQL(alteration))
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_truncate_table(schema: str, table: str, cascade: bool = False, restart_identity: bool = False) -> str:
+@_dangerous("Table truncation requires")
+@_required_str("schema", "table")
+async def pg_truncate_table(schema: str, table: str, cascade: bool = False, restart_identity: bool = False) -> str:
     """
     Truncate a table (remove all rows quickly).
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Table truncation requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    
-    if not schema or not table:
-        return "Error: schema and table are required"
-    
     try:
-        sql = f'TRUNCATE TABLE "{schema}"."{table}"'
-        if restart_identity:
-            sql += ' RESTART IDENTITY'
-        if cascade:
-            sql += ' CASCADE'
+        sql = SQL("TRUNCATE TABLE {}{}{}").format(
+            Identifier(schema, table),
+            SQL(" RESTART IDENTITY") if restart_identity else SQL(""),
+            SQL(" CASCADE") if cascade else SQL(""),
+        )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -1064,8 +1223,19 @@ def pg_truncate_table(schema: str, table: str, cascade: bool = False, restart_id
 # -----------------------------
 # Index Operations
 # -----------------------------
-@mcp.tool()
-def pg_list_indexes(schema: str, table: str = None) -> List[Dict[str, Any]]:
+_TABLE_INDEXES_SQL = """
+    SELECT
+      schemaname AS schema,
+      tablename AS table,
+      indexname AS index,
+      indexdef AS definition
+    FROM pg_indexes
+    WHERE schemaname = %s AND tablename = %s
+    ORDER BY tablename, indexname
+"""
+
+@mcp.tool()
+async def pg_list_indexes(schema: str, table: str = None) -> List[Dict[str, Any]]:
     """List indexes for a table or all tables in schema."""
     schema = (schema or "").strip()
     if not schema:
@@ -1073,21 +1243,9 @@ def pg_list_indexes(schema: str, table: str = None) -> List[Dict[str, Any]]:
     
     if table:
         table = table.strip()
-        return _fetch_all(
-            """
-            SELECT
-              schemaname AS schema,
-              tablename AS table,
-              indexname AS index,
-              indexdef AS definition
-            FROM pg_indexes
-            WHERE schemaname = %s AND tablename = %s
-            ORDER BY tablename, indexname
-            """,
-            (schema, table)
-        )
+        return await _fetch_all(_TABLE_INDEXES_SQL, (schema, table))
     else:
-        return _fetch_all(
+        return await _fetch_all(
             """
             SELECT
               schemaname AS schema,
@@ -1101,50 +1259,50 @@ def pg_list_indexes(schema: str, table: str = None) -> List[Dict[str, Any]]:
             (schema,)
         )
 
-@mcp.tool()
-def pg_index_usage(schema: str = "public") -> List[Dict[str, Any]]:
+_INDEX_USAGE_SQL = _with_result_cache_hint("""
+    SELECT
+      schemaname AS schema,
+      relname AS table,
+      indexrelname AS index,
+      idx_scan AS scans,
+      idx_tup_read AS rows_read,
+      idx_tup_fetch AS rows_fetched,
+      pg_size_pretty(pg_relation_size(indexrelid)) AS size
+    FROM pg_stat_user_indexes
+    WHERE schemaname = %s
+    ORDER BY idx_scan ASC, pg_relation_size(indexrelid) DESC
+""")
+
+@mcp.tool()
+async def pg_index_usage(schema: str = "public") -> List[Dict[str, Any]]:
     """Show index usage statistics."""
     schema = (schema or "public").strip()
-    return _fetch_all(
-        """
-        SELECT
-          schemaname AS schema,
-          tablename AS table,
-          indexname AS index,
-          idx_scan AS scans,
-          idx_tup_read AS rows_read,
-          idx_tup_fetch AS rows_fetched,
-          pg_size_pretty(pg_relation_size(indexrelid)) AS size
-        FROM pg_stat_user_indexes
-        WHERE schemaname = %s
-        ORDER BY idx_scan ASC, pg_relation_size(indexrelid) DESC
-        """,
-        (schema,)
-    )
-
-@mcp.tool()
-def pg_unused_indexes(schema: str = "public") -> List[Dict[str, Any]]:
+    return await _fetch_all(_INDEX_USAGE_SQL, (schema,))
+
+_UNUSED_INDEXES_SQL = _with_result_cache_hint("""
+    SELECT
+      schemaname AS schema,
+      relname AS table,
+      indexrelname AS index,
+      pg_size_pretty(pg_relation_size(indexrelid)) AS size,
+      idx_scan AS scans
+    FROM pg_stat_user_indexes
+    WHERE schemaname = %s 
+      AND idx_scan = 0
+      AND indexrelid::regclass::text NOT LIKE '%%_pkey'
+    ORDER BY pg_relation_size(indexrelid) DESC
+""")
+
+@mcp.tool()
+async def pg_unused_indexes(schema: str = "public") -> List[Dict[str, Any]]:
     """Find potentially unused indexes (0 scans)."""
     schema = (schema or "public").strip()
-    return _fetch_all(
-        """
-        SELECT
-          schemaname AS schema,
-          tablename AS table,
-          indexname AS index,
-          pg_size_pretty(pg_relation_size(indexrelid)) AS size,
-          idx_scan AS scans
-        FROM pg_stat_user_indexes
-        WHERE schemaname = %s 
-          AND idx_scan = 0
-          AND indexrelid::regclass::text NOT LIKE '%_pkey'
-        ORDER BY pg_relation_size(indexrelid) DESC
-        """,
-        (schema,)
-    )
+    return await _fetch_all(_UNUSED_INDEXES_SQL, (schema,))
 
 @mcp.tool()
-def pg_create_index(schema: str, table: str, index_name: str, columns: str, unique: bool = False, method: str = "btree") -> str:
+@_dangerous("Index creation requires")
+@_required_str("schema", "table", "index_name", "columns")
+async def pg_create_index(schema: str, table: str, index_name: str, columns: str, unique: bool = False, method: str = "btree") -> str:
     """
     Create an index.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1155,71 +1313,53 @@ def pg_create_index(schema: str, table: str, index_name: str, columns: str, uniq
     - columns: "created_at DESC"
     - method: "btree", "hash", "gist", "gin", "brin"
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Index creation requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    index_name = (index_name or "").strip()
-    columns = (columns or "").strip()
-    
-    if not all([schema, table, index_name, columns]):
-        return "Error: schema, table, index_name, and columns are required"
-    
     try:
-        unique_clause = "UNIQUE " if unique else ""
-        sql = f'CREATE {unique_clause}INDEX "{index_name}" ON "{schema}"."{table}" USING {method} ({columns})'
-        return _execute(sql)
+        sql = SQL("CREATE {}INDEX {} ON {} USING {} ({})").format(
+            SQL("UNIQUE ") if unique else SQL(""),
+            Identifier(index_name),
+            Identifier(schema, table),
+            Identifier((method or "btree").strip().lower()),
+            SQL(columns),
+        )
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_drop_index(schema: str, index_name: str, cascade: bool = False) -> str:
+@_dangerous("Index deletion requires")
+@_required_str("schema", "index_name")
+async def pg_drop_index(schema: str, index_name: str, cascade: bool = False) -> str:
     """
     Drop an index.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Index deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    index_name = (index_name or "").strip()
-    
-    if not schema or not index_name:
-        return "Error: schema and index_name are required"
-    
     try:
-        sql = f'DROP INDEX "{schema}"."{index_name}"'
-        if cascade:
-            sql += ' CASCADE'
+        sql = SQL("DROP INDEX {}{}").format(
+            Identifier(schema, index_name), SQL(" CASCADE") if cascade else SQL("")
+        )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_reindex(schema: str, table: str = None, index: str = None) -> str:
+@_dangerous("Reindexing requires")
+@_required_str("schema")
+async def pg_reindex(schema: str, table: str = None, index: str = None) -> str:
     """
     Rebuild indexes.
     Requires ENABLE_DANGEROUS=true in environment.
     Specify either table (rebuilds all indexes) or index (rebuilds specific index).
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Reindexing requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    if not schema:
-        return "Error: schema is required"
-    
     try:
         if index:
-            sql = f'REINDEX INDEX "{schema}"."{index}"'
+            sql = SQL("REINDEX INDEX {}").format(Identifier(schema, index))
         elif table:
-            sql = f'REINDEX TABLE "{schema}"."{table}"'
+            sql = SQL("REINDEX TABLE {}").format(Identifier(schema, table))
         else:
             return "Error: either table or index must be specified"
         
-        return _execute(sql)
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -1228,10 +1368,11 @@ def pg_reindex(schema: str, table: str = None, index: str = None) -> str:
 # Schema Introspection
 # -----------------------------
 @mcp.tool()
-def pg_list_views(schema: str = "public") -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_views(schema: str = "public") -> List[Dict[str, Any]]:
     """List views in a schema."""
     schema = (schema or "public").strip()
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           schemaname AS schema,
@@ -1245,14 +1386,14 @@ def pg_list_views(schema: str = "public") -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_view_definition(schema: str, view: str) -> Dict[str, Any]:
+async def pg_view_definition(schema: str, view: str) -> Dict[str, Any]:
     """Get the SQL definition of a view."""
     schema = (schema or "").strip()
     view = (view or "").strip()
     if not schema or not view:
         return {"error": "schema and view are required"}
     
-    return _fetch_one(
+    return await _fetch_one(
         """
         SELECT
           schemaname AS schema,
@@ -1264,23 +1405,21 @@ def pg_view_definition(schema: str, view: str) -> Dict[str, Any]:
         (schema, view)
     )
 
+_PROKIND = {"f": "function", "p": "procedure", "a": "aggregate", "w": "window"}
+
 @mcp.tool()
-def pg_list_functions(schema: str = "public") -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_functions(schema: str = "public") -> List[Dict[str, Any]]:
     """List functions/procedures in a schema."""
     schema = (schema or "public").strip()
-    return _fetch_all(
+    rows = await _fetch_all(
         """
         SELECT
           n.nspname AS schema,
           p.proname AS function,
           pg_get_function_result(p.oid) AS returns,
           pg_get_function_arguments(p.oid) AS arguments,
-          CASE p.prokind
-            WHEN 'f' THEN 'function'
-            WHEN 'p' THEN 'procedure'
-            WHEN 'a' THEN 'aggregate'
-            WHEN 'w' THEN 'window'
-          END AS type
+          p.prokind
         FROM pg_proc p
         JOIN pg_namespace n ON p.pronamespace = n.oid
         WHERE n.nspname = %s
@@ -1288,72 +1427,117 @@ def pg_list_functions(schema: str = "public") -> List[Dict[str, Any]]:
         """,
         (schema,)
     )
-
-@mcp.tool()
-def pg_table_constraints(schema: str, table: str) -> List[Dict[str, Any]]:
+    # prokind is a single char on the wire; spell it out here rather than per row in SQL
+    for row in rows:
+        row["type"] = _PROKIND.get(row.pop("prokind"))
+    return rows
+
+# One row per constraint; multi-column keys are returned as ordered arrays
+_TABLE_CONSTRAINTS_SQL = """
+    SELECT
+      c.conname AS constraint,
+      CASE c.contype
+        WHEN 'p' THEN 'PRIMARY KEY'
+        WHEN 'f' THEN 'FOREIGN KEY'
+        WHEN 'u' THEN 'UNIQUE'
+        WHEN 'c' THEN 'CHECK'
+        WHEN 'x' THEN 'EXCLUDE'
+        ELSE c.contype::text
+      END AS type,
+      ARRAY(
+        SELECT att.attname
+        FROM unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute att ON att.attrelid = c.conrelid AND att.attnum = k.attnum
+        ORDER BY k.ord
+      ) AS columns,
+      fns.nspname AS foreign_schema,
+      fcl.relname AS foreign_table,
+      CASE WHEN c.contype = 'f' THEN ARRAY(
+        SELECT fatt.attname
+        FROM unnest(c.confkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute fatt ON fatt.attrelid = c.confrelid AND fatt.attnum = k.attnum
+        ORDER BY k.ord
+      ) END AS foreign_columns
+    FROM pg_constraint c
+    JOIN pg_class cl ON cl.oid = c.conrelid
+    JOIN pg_namespace ns ON ns.oid = cl.relnamespace
+    LEFT JOIN pg_class fcl ON fcl.oid = c.confrelid
+    LEFT JOIN pg_namespace fns ON fns.oid = fcl.relnamespace
+    WHERE ns.nspname = %s AND cl.relname = %s
+    ORDER BY type, c.conname
+"""
+
+@mcp.tool()
+async def pg_table_constraints(schema: str, table: str) -> List[Dict[str, Any]]:
     """List all constraints for a table (PK, FK, unique, check)."""
     schema = (schema or "").strip()
     table = (table or "").strip()
     if not schema or not table:
         return [{"error": "schema and table are required"}]
     
-    return _fetch_all(
-        """
-        SELECT
-          tc.constraint_name AS constraint,
-          tc.constraint_type AS type,
-          kcu.column_name AS column,
-          ccu.table_schema AS foreign_schema,
-          ccu.table_name AS foreign_table,
-          ccu.column_name AS foreign_column
-        FROM information_schema.table_constraints tc
-        LEFT JOIN information_schema.key_column_usage kcu
-          ON tc.constraint_name = kcu.constraint_name
-          AND tc.table_schema = kcu.table_schema
-        LEFT JOIN information_schema.constraint_column_usage ccu
-          ON tc.constraint_name = ccu.constraint_name
-          AND tc.table_schema = ccu.table_schema
-        WHERE tc.table_schema = %s AND tc.table_name = %s
-        ORDER BY tc.constraint_type, tc.constraint_name
-        """,
-        (schema, table)
-    )
+    return await _fetch_all(_TABLE_CONSTRAINTS_SQL, (schema, table))
 
 @mcp.tool()
-def pg_foreign_keys(schema: str = "public") -> List[Dict[str, Any]]:
+async def pg_foreign_keys(schema: str = "public") -> List[Dict[str, Any]]:
     """List all foreign key relationships in a schema."""
     schema = (schema or "public").strip()
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
-          tc.table_schema AS schema,
-          tc.table_name AS table,
-          kcu.column_name AS column,
-          ccu.table_schema AS foreign_schema,
-          ccu.table_name AS foreign_table,
-          ccu.column_name AS foreign_column,
-          tc.constraint_name AS constraint
-        FROM information_schema.table_constraints tc
-        JOIN information_schema.key_column_usage kcu
-          ON tc.constraint_name = kcu.constraint_name
-          AND tc.table_schema = kcu.table_schema
-        JOIN information_schema.constraint_column_usage ccu
-          ON tc.constraint_name = ccu.constraint_name
-          AND tc.table_schema = ccu.table_schema
-        WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = %s
-        ORDER BY tc.table_name, kcu.column_name
+          ns.nspname AS schema,
+          cl.relname AS table,
+          att.attname AS column,
+          fns.nspname AS foreign_schema,
+          fcl.relname AS foreign_table,
+          fatt.attname AS foreign_column,
+          c.conname AS constraint
+        FROM pg_constraint c
+        JOIN pg_class cl ON cl.oid = c.conrelid
+        JOIN pg_namespace ns ON ns.oid = cl.relnamespace
+        JOIN pg_class fcl ON fcl.oid = c.confrelid
+        JOIN pg_namespace fns ON fns.oid = fcl.relnamespace
+        CROSS JOIN LATERAL unnest(c.conkey, c.confkey) AS k(attnum, fattnum)
+        JOIN pg_attribute att ON att.attrelid = c.conrelid AND att.attnum = k.attnum
+        JOIN pg_attribute fatt ON fatt.attrelid = c.confrelid AND fatt.attnum = k.fattnum
+        WHERE c.contype = 'f' AND ns.nspname = %s
+        ORDER BY cl.relname, att.attname
         """,
         (schema,)
     )
 
+@mcp.tool()
+async def pg_table_overview(schema: str, table: str) -> Dict[str, Any]:
+    """Columns, constraints, indexes and stats for a table in a single round-trip."""
+    schema = (schema or "").strip()
+    table = (table or "").strip()
+    if not schema or not table:
+        return {"error": "schema and table are required"}
+
+    params = (schema, table)
+    columns, constraints, indexes, stats = await _fetch_many([
+        (_DESCRIBE_TABLE_SQL, params),
+        (_TABLE_CONSTRAINTS_SQL, params),
+        (_TABLE_INDEXES_SQL, params),
+        (_TABLE_STATS_SQL, params),
+    ])
+    return {
+        "schema": schema,
+        "table": table,
+        "columns": columns,
+        "constraints": constraints,
+        "indexes": indexes,
+        "stats": stats[0] if stats else {},
+    }
+
 
 # -----------------------------
 # User & Permission Management
 # -----------------------------
 @mcp.tool()
-def pg_list_users() -> List[Dict[str, Any]]:
+@_ttl_cache(30)
+async def pg_list_users() -> List[Dict[str, Any]]:
     """List all database users/roles."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           rolname AS username,
@@ -1370,13 +1554,13 @@ def pg_list_users() -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_user_permissions(username: str) -> List[Dict[str, Any]]:
+async def pg_user_permissions(username: str) -> List[Dict[str, Any]]:
     """Show permissions for a specific user."""
     username = (username or "").strip()
     if not username:
         return [{"error": "username is required"}]
     
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           schemaname AS schema,
@@ -1390,14 +1574,14 @@ def pg_user_permissions(username: str) -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_table_permissions(schema: str, table: str) -> List[Dict[str, Any]]:
+async def pg_table_permissions(schema: str, table: str) -> List[Dict[str, Any]]:
     """Show all permissions granted on a specific table."""
     schema = (schema or "").strip()
     table = (table or "").strip()
     if not schema or not table:
         return [{"error": "schema and table are required"}]
     
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           grantee AS user,
@@ -1411,20 +1595,15 @@ def pg_table_permissions(schema: str, table: str) -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_create_user(username: str, password: str, superuser: bool = False, createdb: bool = False, 
+@_dangerous("User creation requires")
+@_required_str("username")
+async def pg_create_user(username: str, password: str, superuser: bool = False, createdb: bool = False, 
                    createrole: bool = False, login: bool = True) -> str:
     """
     Create a new user/role.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: User creation requires ENABLE_DANGEROUS=true in environment"
-    
-    username = (username or "").strip()
-    if not username:
-        return "Error: username is required"
-    
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', username):
+    if not _IDENT_RE.match(username):
         return "Error: invalid username"
     
     try:
@@ -1438,79 +1617,65 @@ def pg_create_user(username: str, password: str, superuser: bool = False, create
         if login:
             options.append("LOGIN")
         
-        options_str = " ".join(options)
-        sql = f"CREATE USER \"{username}\" WITH {options_str} PASSWORD %s"
+        # Utility statements cannot take bind parameters, so the password is a quoted literal
+        sql = SQL("CREATE USER {} WITH {} PASSWORD {}").format(
+            Identifier(username), SQL(" ".join(options)), Literal(password)
+        )
         
-        return _execute(sql, (password,))
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_alter_user(username: str, password: str = None, superuser: bool = None, 
+@_dangerous("User alteration requires")
+@_required_str("username")
+async def pg_alter_user(username: str, password: str = None, superuser: bool = None, 
                   createdb: bool = None, createrole: bool = None, login: bool = None) -> str:
     """
     Alter user attributes.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: User alteration requires ENABLE_DANGEROUS=true in environment"
-    
-    username = (username or "").strip()
-    if not username:
-        return "Error: username is required"
-    
     try:
         alterations = []
         
         if password is not None:
-            alterations.append(("PASSWORD %s", password))
+            alterations.append(SQL("PASSWORD {}").format(Literal(password)))
         if superuser is not None:
-            alterations.append((("SUPERUSER" if superuser else "NOSUPERUSER"), None))
+            alterations.append(SQL("SUPERUSER" if superuser else "NOSUPERUSER"))
         if createdb is not None:
-            alterations.append((("CREATEDB" if createdb else "NOCREATEDB"), None))
+            alterations.append(SQL("CREATEDB" if createdb else "NOCREATEDB"))
         if createrole is not None:
-            alterations.append((("CREATEROLE" if createrole else "NOCREATEROLE"), None))
+            alterations.append(SQL("CREATEROLE" if createrole else "NOCREATEROLE"))
         if login is not None:
-            alterations.append((("LOGIN" if login else "NOLOGIN"), None))
+            alterations.append(SQL("LOGIN" if login else "NOLOGIN"))
         
         if not alterations:
             return "Error: no alterations specified"
         
-        # Build SQL with parameters
-        sql_parts = []
-        params = []
-        for alt, param in alterations:
-            sql_parts.append(alt)
-            if param is not None:
-                params.append(param)
-        
-        sql = f"ALTER USER \"{username}\" WITH {' '.join(sql_parts)}"
+        sql = SQL("ALTER USER {} WITH {}").format(Identifier(username), SQL(" ").join(alterations))
         
-        return _execute(sql, tuple(params) if params else None)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_drop_user(username: str) -> str:
+@_dangerous("User deletion requires")
+@_required_str("username")
+async def pg_drop_user(username: str) -> str:
     """
     Drop a user/role.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: User deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    username = (username or "").strip()
-    if not username:
-        return "Error: username is required"
-    
     try:
-        sql = f'DROP USER "{username}"'
-        return _execute(sql)
+        sql = SQL("DROP USER {}").format(Identifier(username))
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_grant_privileges(username: str, privileges: str, schema: str, table: str = None) -> str:
+@_dangerous("Granting privileges requires")
+@_required_str("username", "privileges", "schema")
+async def pg_grant_privileges(username: str, privileges: str, schema: str, table: str = None) -> str:
     """
     Grant privileges to a user.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1520,49 +1685,39 @@ def pg_grant_privileges(username: str, privileges: str, schema: str, table: str
     - privileges: "ALL PRIVILEGES"
     - table: specific table name, or None for all tables in schema
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Granting privileges requires ENABLE_DANGEROUS=true in environment"
-    
-    username = (username or "").strip()
-    privileges = (privileges or "").strip()
-    schema = (schema or "").strip()
-    
-    if not all([username, privileges, schema]):
-        return "Error: username, privileges, and schema are required"
-    
     try:
         if table:
-            sql = f'GRANT {privileges} ON TABLE "{schema}"."{table}" TO "{username}"'
+            sql = SQL("GRANT {} ON TABLE {} TO {}").format(
+                SQL(privileges), Identifier(schema, table), Identifier(username)
+            )
         else:
-            sql = f'GRANT {privileges} ON ALL TABLES IN SCHEMA "{schema}" TO "{username}"'
+            sql = SQL("GRANT {} ON ALL TABLES IN SCHEMA {} TO {}").format(
+                SQL(privileges), Identifier(schema), Identifier(username)
+            )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_revoke_privileges(username: str, privileges: str, schema: str, table: str = None) -> str:
+@_dangerous("Revoking privileges requires")
+@_required_str("username", "privileges", "schema")
+async def pg_revoke_privileges(username: str, privileges: str, schema: str, table: str = None) -> str:
     """
     Revoke privileges from a user.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Revoking privileges requires ENABLE_DANGEROUS=true in environment"
-    
-    username = (username or "").strip()
-    privileges = (privileges or "").strip()
-    schema = (schema or "").strip()
-    
-    if not all([username, privileges, schema]):
-        return "Error: username, privileges, and schema are required"
-    
     try:
         if table:
-            sql = f'REVOKE {privileges} ON TABLE "{schema}"."{table}" FROM "{username}"'
+            sql = SQL("REVOKE {} ON TABLE {} FROM {}").format(
+                SQL(privileges), Identifier(schema, table), Identifier(username)
+            )
         else:
-            sql = f'REVOKE {privileges} ON ALL TABLES IN SCHEMA "{schema}" FROM "{username}"'
+            sql = SQL("REVOKE {} ON ALL TABLES IN SCHEMA {} FROM {}").format(
+                SQL(privileges), Identifier(schema), Identifier(username)
+            )
         
-        return _execute(sql)
+        return await _execute(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -1571,12 +1726,10 @@ def pg_revoke_privileges(username: str, privileges: str, schema: str, table: str
 # Performance & Monitoring
 # -----------------------------
 @mcp.tool()
-def pg_active_queries(include_idle: bool = False) -> List[Dict[str, Any]]:
+async def pg_active_queries(include_idle: bool = False) -> List[Dict[str, Any]]:
     """Show currently running queries."""
-    where_clause = "" if include_idle else "AND state != 'idle'"
-    
-    return _fetch_all(
-        f"""
+    return await _fetch_all(
+        """
         SELECT
           pid,
           usename AS user,
@@ -1590,16 +1743,17 @@ def pg_active_queries(include_idle: bool = False) -> List[Dict[str, Any]]:
           LEFT(query, 200) AS query
         FROM pg_stat_activity
         WHERE pid != pg_backend_pid()
-          {where_clause}
+          AND (%s OR state != 'idle')
         ORDER BY query_start DESC
         LIMIT 50
-        """
+        """,
+        (include_idle,)
     )
 
 @mcp.tool()
-def pg_long_running_queries(min_seconds: int = 60) -> List[Dict[str, Any]]:
+async def pg_long_running_queries(min_seconds: int = 60) -> List[Dict[str, Any]]:
     """Find queries running longer than specified seconds."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           pid,
@@ -1612,49 +1766,38 @@ def pg_long_running_queries(min_seconds: int = 60) -> List[Dict[str, Any]]:
         FROM pg_stat_activity
         WHERE state = 'active'
           AND pid != pg_backend_pid()
-          AND query_start < now() - interval '%s seconds'
+          AND query_start < now() - make_interval(secs => %s)
         ORDER BY query_start
         """,
         (min_seconds,)
     )
 
 @mcp.tool()
-def pg_blocking_queries() -> List[Dict[str, Any]]:
+async def pg_blocking_queries() -> List[Dict[str, Any]]:
     """Find queries that are blocking other queries."""
-    return _fetch_all(
+    # pg_blocking_pids() walks the lock table once per waiter instead of self-joining pg_locks
+    return await _fetch_all(
         """
         SELECT
-          blocked_locks.pid AS blocked_pid,
-          blocked_activity.usename AS blocked_user,
-          blocking_locks.pid AS blocking_pid,
-          blocking_activity.usename AS blocking_user,
-          blocked_activity.query AS blocked_query,
-          blocking_activity.query AS blocking_query,
-          blocked_activity.state AS blocked_state,
-          blocking_activity.state AS blocking_state
-        FROM pg_catalog.pg_locks blocked_locks
-        JOIN pg_catalog.pg_stat_activity blocked_activity ON blocked_activity.pid = blocked_locks.pid
-        JOIN pg_catalog.pg_locks blocking_locks 
-          ON blocking_locks.locktype = blocked_locks.locktype
-          AND blocking_locks.database IS NOT DISTINCT FROM blocked_locks.database
-          AND blocking_locks.relation IS NOT DISTINCT FROM blocked_locks.relation
-          AND blocking_locks.page IS NOT DISTINCT FROM blocked_locks.page
-          AND blocking_locks.tuple IS NOT DISTINCT FROM blocked_locks.tuple
-          AND blocking_locks.virtualxid IS NOT DISTINCT FROM blocked_locks.virtualxid
-          AND blocking_locks.transactionid IS NOT DISTINCT FROM blocked_locks.transactionid
-          AND blocking_locks.classid IS NOT DISTINCT FROM blocked_locks.classid
-          AND blocking_locks.objid IS NOT DISTINCT FROM blocked_locks.objid
-          AND blocking_locks.objsubid IS NOT DISTINCT FROM blocked_locks.objsubid
-          AND blocking_locks.pid != blocked_locks.pid
-        JOIN pg_catalog.pg_stat_activity blocking_activity ON blocking_activity.pid = blocking_locks.pid
-        WHERE NOT blocked_locks.granted
+          blocked.pid AS blocked_pid,
+          blocked.usename AS blocked_user,
+          blocking.pid AS blocking_pid,
+          blocking.usename AS blocking_user,
+          blocked.query AS blocked_query,
+          blocking.query AS blocking_query,
+          blocked.state AS blocked_state,
+          blocking.state AS blocking_state
+        FROM pg_catalog.pg_stat_activity blocked
+        CROSS JOIN LATERAL unnest(pg_catalog.pg_blocking_pids(blocked.pid)) AS b(pid)
+        JOIN pg_catalog.pg_stat_activity blocking ON blocking.pid = b.pid
+        WHERE blocked.wait_event_type = 'Lock'
         """
     )
 
 @mcp.tool()
-def pg_connection_stats() -> Dict[str, Any]:
+async def pg_connection_stats() -> Dict[str, Any]:
     """Get connection statistics."""
-    return _fetch_one(
+    return await _fetch_one(
         """
         SELECT
           count(*) AS total_connections,
@@ -1668,24 +1811,28 @@ def pg_connection_stats() -> Dict[str, Any]:
     )
 
 @mcp.tool()
-def pg_locks_summary() -> List[Dict[str, Any]]:
-    """Get summary of current locks."""
-    return _fetch_all(
+async def pg_locks_summary() -> List[Dict[str, Any]]:
+    """Get summary of current locks, broken down by holding user and database."""
+    return await _fetch_all(
         """
         SELECT
-          locktype,
-          mode,
+          l.locktype,
+          l.mode,
+          a.usename,
+          a.datname,
           count(*) AS count
-        FROM pg_locks
-        GROUP BY locktype, mode
+        FROM pg_locks l
+        LEFT JOIN pg_stat_activity a ON a.pid = l.pid
+        GROUP BY l.locktype, l.mode, a.usename, a.datname
         ORDER BY count DESC
         """
     )
 
 @mcp.tool()
-def pg_cache_hit_ratio() -> Dict[str, Any]:
+@_ttl_cache(PG_STATS_CACHE_SECONDS)
+async def pg_cache_hit_ratio() -> Dict[str, Any]:
     """Show cache hit ratio for the database."""
-    return _fetch_one(
+    return await _fetch_one(
         """
         SELECT
           sum(heap_blks_read) AS heap_read,
@@ -1695,64 +1842,122 @@ def pg_cache_hit_ratio() -> Dict[str, Any]:
         """
     )
 
+# Top-N on raw columns for the current database first, then format only those rows
+_SLOWEST_STATEMENTS_SQL = """
+    SELECT
+      LEFT(query, 200) AS query,
+      calls,
+      ROUND(total_exec_time::numeric, 2) AS total_time_ms,
+      ROUND(mean_exec_time::numeric, 2) AS mean_time_ms,
+      ROUND(max_exec_time::numeric, 2) AS max_time_ms,
+      rows AS total_rows
+    FROM (
+      SELECT query, calls, total_exec_time, mean_exec_time, max_exec_time, rows
+      FROM pg_stat_statements
+      WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+      ORDER BY total_exec_time DESC
+      LIMIT %s
+    ) top
+    ORDER BY total_exec_time DESC
+    """
+
+# pg_stat_monitor keeps per-bucket rows; only the most recent bucket is ranked
+_SLOWEST_MONITOR_SQL = """
+    SELECT
+      LEFT(query, 200) AS query,
+      calls,
+      ROUND(total_exec_time::numeric, 2) AS total_time_ms,
+      ROUND(mean_exec_time::numeric, 2) AS mean_time_ms,
+      ROUND(max_exec_time::numeric, 2) AS max_time_ms,
+      rows AS total_rows
+    FROM (
+      SELECT query, calls, total_exec_time, mean_exec_time, max_exec_time, rows
+      FROM pg_stat_monitor
+      WHERE datname = current_database()
+        AND bucket_start_time = (SELECT max(bucket_start_time) FROM pg_stat_monitor)
+      ORDER BY total_exec_time DESC
+      LIMIT %s
+    ) top
+    ORDER BY total_exec_time DESC
+    """
+
+# Statement-stats extension in use, probed on first call ("pg_stat_monitor" or "pg_stat_statements")
+_STATEMENT_STATS_EXT: Optional[str] = None
+
+async def _statement_stats_ext() -> Optional[str]:
+    global _STATEMENT_STATS_EXT
+    if _STATEMENT_STATS_EXT is None:
+        rows = await _fetch_all(
+            "SELECT extname FROM pg_extension WHERE extname IN ('pg_stat_monitor', 'pg_stat_statements')"
+        )
+        names = {r["extname"] for r in rows}
+        if "pg_stat_monitor" in names:
+            _STATEMENT_STATS_EXT = "pg_stat_monitor"
+        elif "pg_stat_statements" in names:
+            _STATEMENT_STATS_EXT = "pg_stat_statements"
+    return _STATEMENT_STATS_EXT
+
 @mcp.tool()
-def pg_slowest_queries(limit: int = 20) -> List[Dict[str, Any]]:
-    """Get slowest queries from pg_stat_statements (if extension is enabled)."""
-    return _fetch_all(
-        """
-        SELECT
-          LEFT(query, 200) AS query,
-          calls,
-          ROUND(total_exec_time::numeric, 2) AS total_time_ms,
-          ROUND(mean_exec_time::numeric, 2) AS mean_time_ms,
-          ROUND(max_exec_time::numeric, 2) AS max_time_ms,
-          rows AS total_rows
-        FROM pg_stat_statements
-        ORDER BY total_exec_time DESC
-        LIMIT %s
-        """,
-        (limit,)
-    )
+@_ttl_cache(PG_STATS_CACHE_SECONDS)
+async def pg_slowest_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """Get slowest queries from pg_stat_monitor or pg_stat_statements (if either extension is enabled)."""
+    if await _statement_stats_ext() == "pg_stat_monitor":
+        return await _fetch_all(_SLOWEST_MONITOR_SQL, (limit,))
+    return await _fetch_all(_SLOWEST_STATEMENTS_SQL, (limit,))
 
 @mcp.tool()
-def pg_kill_query(pid: int) -> str:
+@_dangerous("Killing queries requires")
+async def pg_kill_query(pid: Union[int, List[int]]) -> str:
     """
     Terminate a running query by its PID.
+    Pass a list of PIDs to terminate several backends in one round-trip.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Killing queries requires ENABLE_DANGEROUS=true in environment"
-    
-    if not pid:
+    pids = pid if isinstance(pid, list) else [pid]
+    if not pids or not all(pids):
         return "Error: pid is required"
     
     try:
-        result = _fetch_one("SELECT pg_terminate_backend(%s) AS terminated", (pid,))
-        if result.get('terminated'):
-            return f"OK: terminated query with PID {pid}"
-        else:
-            return f"Error: could not terminate query with PID {pid}"
+        rows = await _fetch_all(
+            "SELECT t.pid, pg_terminate_backend(t.pid) AS terminated FROM unnest(%s::int[]) AS t(pid)",
+            (pids,)
+        )
+        failed = [r["pid"] for r in rows if not r["terminated"]]
+        if len(pids) == 1:
+            if failed:
+                return f"Error: could not terminate query with PID {pids[0]}"
+            return f"OK: terminated query with PID {pids[0]}"
+        if failed:
+            return f"Error: could not terminate queries with PIDs {', '.join(map(str, failed))}"
+        return f"OK: terminated queries with PIDs {', '.join(map(str, pids))}"
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_cancel_query(pid: int) -> str:
+@_dangerous("Canceling queries requires")
+async def pg_cancel_query(pid: Union[int, List[int]]) -> str:
     """
     Cancel a running query by its PID (gentler than kill).
+    Pass a list of PIDs to cancel several backends in one round-trip.
     Requires ENABLE_DANGEROUS=true in environment.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Canceling queries requires ENABLE_DANGEROUS=true in environment"
-    
-    if not pid:
+    pids = pid if isinstance(pid, list) else [pid]
+    if not pids or not all(pids):
         return "Error: pid is required"
     
     try:
-        result = _fetch_one("SELECT pg_cancel_backend(%s) AS cancelled", (pid,))
-        if result.get('cancelled'):
-            return f"OK: cancelled query with PID {pid}"
-        else:
-            return f"Error: could not cancel query with PID {pid}"
+        rows = await _fetch_all(
+            "SELECT t.pid, pg_cancel_backend(t.pid) AS cancelled FROM unnest(%s::int[]) AS t(pid)",
+            (pids,)
+        )
+        failed = [r["pid"] for r in rows if not r["cancelled"]]
+        if len(pids) == 1:
+            if failed:
+                return f"Error: could not cancel query with PID {pids[0]}"
+            return f"OK: cancelled query with PID {pids[0]}"
+        if failed:
+            return f"Error: could not cancel queries with PIDs {', '.join(map(str, failed))}"
+        return f"OK: cancelled queries with PIDs {', '.join(map(str, pids))}"
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -1761,9 +1966,10 @@ def pg_cancel_query(pid: int) -> str:
 # Maintenance Operations
 # -----------------------------
 @mcp.tool()
-def pg_vacuum_stats() -> List[Dict[str, Any]]:
-    """Show when tables were last vacuumed and analyzed."""
-    return _fetch_all(
+@_ttl_cache(PG_STATS_CACHE_SECONDS)
+async def pg_vacuum_stats() -> List[Dict[str, Any]]:
+    """Show when tables with dead rows (or never autovacuumed) were last vacuumed and analyzed."""
+    return await _fetch_all(
         """
         SELECT
           schemaname AS schema,
@@ -1775,68 +1981,71 @@ def pg_vacuum_stats() -> List[Dict[str, Any]]:
           n_dead_tup AS dead_rows,
           n_live_tup AS live_rows
         FROM pg_stat_user_tables
+        WHERE n_dead_tup > 0 OR last_autovacuum IS NULL
         ORDER BY last_autovacuum NULLS FIRST, n_dead_tup DESC
         LIMIT 50
         """
     )
 
+_VACUUM_SQL = SQL("VACUUM {full}{analyze}{tbl}")
+
 @mcp.tool()
-def pg_vacuum_table(schema: str, table: str, full: bool = False, analyze: bool = True) -> str:
+@_dangerous("Vacuum operations require")
+@_required_str("schema", "table")
+async def pg_vacuum_table(schema: str, table: str, full: bool = False, analyze: bool = True) -> str:
     """
     Vacuum a table to reclaim space and update statistics.
     Requires ENABLE_DANGEROUS=true in environment.
     Set full=true for VACUUM FULL (locks table, reclaims more space).
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Vacuum operations require ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    
-    if not schema or not table:
-        return "Error: schema and table are required"
-    
     try:
-        full_clause = "FULL " if full else ""
-        analyze_clause = "ANALYZE " if analyze else ""
-        sql = f'VACUUM {full_clause}{analyze_clause}"{schema}"."{table}"'
+        sql = _VACUUM_SQL.format(
+            full=SQL("FULL ") if full else SQL(""),
+            analyze=SQL("ANALYZE ") if analyze else SQL(""),
+            tbl=Identifier(schema, table),
+        )
         
-        return _execute(sql)
+        # VACUUM cannot run inside a transaction block
+        return await _execute_autocommit(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
+# ANALYZE accepts a table list (PostgreSQL 11+); bound the statement length per call
+_ANALYZE_BATCH = 64
+_ANALYZE_SQL = SQL("ANALYZE {tbls}")
+
 @mcp.tool()
-def pg_analyze_table(schema: str, table: str = None) -> str:
+@_dangerous("Analyze operations require")
+@_required_str("schema")
+async def pg_analyze_table(schema: str, table: str = None) -> str:
     """
     Analyze table(s) to update statistics for query planner.
     Requires ENABLE_DANGEROUS=true in environment.
     If table is None, analyzes all tables in schema.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Analyze operations require ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    if not schema:
-        return "Error: schema is required"
-    
     try:
         if table:
-            sql = f'ANALYZE "{schema}"."{table}"'
+            sql = _ANALYZE_SQL.format(tbls=Identifier(schema, table))
         else:
-            # Analyze all tables in schema
-            tables = pg_list_tables(schema)
-            for t in tables:
-                _execute(f'ANALYZE "{schema}"."{t["table"]}"')
+            # Analyze all tables in schema, up to _ANALYZE_BATCH tables per statement
+            # Read the catalog directly: a cached listing could name dropped tables or miss new ones
+            tables = await _fetch_all(_LIST_TABLES_SQL, (schema,))
+            for i in range(0, len(tables), _ANALYZE_BATCH):
+                batch = tables[i:i + _ANALYZE_BATCH]
+                # A batch can outlast the pooled statement_timeout, so run it on the lifted path
+                await _execute_long(_ANALYZE_SQL.format(
+                    tbls=SQL(", ").join(Identifier(schema, t["table"]) for t in batch)
+                ))
             return f"OK: analyzed {len(tables)} tables in schema {schema}"
         
-        return _execute(sql)
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_replication_status() -> List[Dict[str, Any]]:
+async def pg_replication_status() -> List[Dict[str, Any]]:
     """Show replication status (if replication is configured)."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           client_addr,
@@ -1853,8 +2062,16 @@ def pg_replication_status() -> List[Dict[str, Any]]:
 # -----------------------------
 # Data Manipulation (DML)
 # -----------------------------
+# Statement skeletons are built once; tools only fill in the quoted target and clauses
+_INSERT_SQL = SQL("INSERT INTO {tbl} ({cols}) VALUES ({vals})")
+_UPDATE_SQL = SQL("UPDATE {tbl} SET {sets}")
+_UPDATE_WHERE_SQL = SQL("UPDATE {tbl} SET {sets} WHERE {where}")
+_DELETE_SQL = SQL("DELETE FROM {tbl} WHERE {where}")
+
 @mcp.tool()
-def pg_insert_data(schema: str, table: str, columns: str, values: str) -> str:
+@_dangerous("Data insertion requires")
+@_required_str("schema", "table", "columns", "values")
+async def pg_insert_data(schema: str, table: str, columns: str, values: str) -> str:
     """
     Insert data into a table.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1863,25 +2080,16 @@ def pg_insert_data(schema: str, table: str, columns: str, values: str) -> str:
     - columns: "name, email, age"
     - values: "'John Doe', 'john@example.com', 30"
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Data insertion requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    columns = (columns or "").strip()
-    values = (values or "").strip()
-    
-    if not all([schema, table, columns, values]):
-        return "Error: schema, table, columns, and values are required"
-    
     try:
-        sql = f'INSERT INTO "{schema}"."{table}" ({columns}) VALUES ({values})'
-        return _execute(sql)
+        sql = _INSERT_SQL.format(tbl=Identifier(schema, table), cols=SQL(columns), vals=SQL(values))
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_update_data(schema: str, table: str, set_clause: str, where_clause: str = None) -> str:
+@_dangerous("Data updates require")
+@_required_str("schema", "table", "set_clause")
+async def pg_update_data(schema: str, table: str, set_clause: str, where_clause: str = None) -> str:
     """
     Update data in a table.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1890,27 +2098,22 @@ def pg_update_data(schema: str, table: str, set_clause: str, where_clause: str =
     - set_clause: "status = 'active', updated_at = NOW()"
     - where_clause: "id = 123" (optional, but recommended to avoid updating all rows)
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Data updates require ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    set_clause = (set_clause or "").strip()
-    
-    if not all([schema, table, set_clause]):
-        return "Error: schema, table, and set_clause are required"
-    
     try:
-        sql = f'UPDATE "{schema}"."{table}" SET {set_clause}'
         if where_clause:
-            sql += f' WHERE {where_clause}'
+            sql = _UPDATE_WHERE_SQL.format(
+                tbl=Identifier(schema, table), sets=SQL(set_clause), where=SQL(where_clause)
+            )
+        else:
+            sql = _UPDATE_SQL.format(tbl=Identifier(schema, table), sets=SQL(set_clause))
         
-        return _execute(sql)
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_delete_data(schema: str, table: str, where_clause: str) -> str:
+@_dangerous("Data deletion requires")
+@_required_str("schema", "table", "where_clause", hint="use pg_truncate_table to delete all rows")
+async def pg_delete_data(schema: str, table: str, where_clause: str) -> str:
     """
     Delete data from a table.
     Requires ENABLE_DANGEROUS=true in environment.
@@ -1918,19 +2121,9 @@ def pg_delete_data(schema: str, table: str, where_clause: str) -> str:
     IMPORTANT: where_clause is REQUIRED to prevent accidental deletion of all rows.
     Use pg_truncate_table if you want to delete all rows.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Data deletion requires ENABLE_DANGEROUS=true in environment"
-    
-    schema = (schema or "").strip()
-    table = (table or "").strip()
-    where_clause = (where_clause or "").strip()
-    
-    if not all([schema, table, where_clause]):
-        return "Error: schema, table, and where_clause are required (use pg_truncate_table to delete all rows)"
-    
     try:
-        sql = f'DELETE FROM "{schema}"."{table}" WHERE {where_clause}'
-        return _execute(sql)
+        sql = _DELETE_SQL.format(tbl=Identifier(schema, table), where=SQL(where_clause))
+        return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -1938,13 +2131,18 @@ def pg_delete_data(schema: str, table: str, where_clause: str) -> str:
 # -----------------------------
 # Safe Query Execution
 # -----------------------------
-_DISALLOWED = re.compile(
-    r"\b(?:insert|update|delete|merge|create|alter|drop|truncate|grant|revoke|copy|call|do|execute|vacuum|analyze|reindex)\b",
-    re.IGNORECASE,
-)
+_DISALLOWED = frozenset({
+    "insert", "update", "delete", "merge", "create", "alter", "drop", "truncate", "grant",
+    "revoke", "copy", "call", "do", "execute", "vacuum", "analyze", "reindex",
+})
+_WORD_RE = re.compile(r"\w+")
+
+def _is_disallowed(sql: str) -> bool:
+    """True if any word of the SQL is a DML/DDL keyword (one linear tokenize + set lookups)."""
+    return not _DISALLOWED.isdisjoint(_WORD_RE.findall(sql.lower()))
 
 @mcp.tool()
-def pg_query(sql: str, max_rows: int = 1000) -> List[Dict[str, Any]]:
+async def pg_query(sql: str, max_rows: int = 1000) -> List[Dict[str, Any]]:
     """
     Execute a SELECT query safely (read-only).
     Blocks any DML/DDL operations for safety.
@@ -1954,7 +2152,7 @@ def pg_query(sql: str, max_rows: int = 1000) -> List[Dict[str, Any]]:
         return [{"error": "SQL query is required"}]
     
     # Safety check
-    if _DISALLOWED.search(sql):
+    if _is_disallowed(sql):
         return [{"error": "Only SELECT queries are allowed. DML/DDL operations are blocked. Use specific admin tools instead."}]
     
     # Ensure it starts with SELECT
@@ -1962,41 +2160,36 @@ def pg_query(sql: str, max_rows: int = 1000) -> List[Dict[str, Any]]:
         return [{"error": "Query must start with SELECT"}]
     
     try:
-        # Add LIMIT if not present
-        if "limit" not in sql.lower():
-            sql = f"{sql} LIMIT {max_rows}"
+        # Cap rows by wrapping rather than guessing whether the text already has a LIMIT;
+        # the newline keeps a trailing -- comment from swallowing the closing paren
+        sql = f"SELECT * FROM (\n{sql.rstrip().rstrip(';')}\n) AS _q LIMIT {int(max_rows)}"
         
-        results = _fetch_all(sql)
+        results = await _fetch_all(sql, prepare=False)
         return results if results else [{"message": "Query executed successfully but returned no rows"}]
     except Exception as e:
         return [{"error": f"Query execution failed: {str(e)}"}]
 
 @mcp.tool()
-def pg_execute_sql(sql: str) -> str:
+@_dangerous("Direct SQL execution requires")
+@_required_str("sql")
+async def pg_execute_sql(sql: str) -> str:
     """
     Execute arbitrary SQL (DML/DDL).
     Requires ENABLE_DANGEROUS=true in environment.
     
     WARNING: Use with extreme caution. Prefer specific admin tools when available.
     """
-    if not ENABLE_DANGEROUS:
-        return "Error: Direct SQL execution requires ENABLE_DANGEROUS=true in environment"
-    
-    sql = (sql or "").strip()
-    if not sql:
-        return "Error: SQL is required"
-    
     try:
         # Check if it's a database-level operation that needs autocommit
         if re.search(r'\b(CREATE|DROP)\s+DATABASE\b', sql, re.IGNORECASE):
-            return _execute_autocommit(sql)
+            return await _execute_autocommit(sql)
         else:
-            return _execute(sql)
+            return await _execute_long(sql)
     except Exception as e:
         return f"Error: {str(e)}"
 
 @mcp.tool()
-def pg_explain_query(sql: str, analyze: bool = False) -> List[Dict[str, Any]]:
+async def pg_explain_query(sql: str, analyze: bool = False) -> List[Dict[str, Any]]:
     """
     Get query execution plan using EXPLAIN.
     Set analyze=True to run EXPLAIN ANALYZE (actually executes the query).
@@ -2006,12 +2199,12 @@ def pg_explain_query(sql: str, analyze: bool = False) -> List[Dict[str, Any]]:
         return [{"error": "SQL query is required"}]
     
     # Safety check for EXPLAIN ANALYZE
-    if analyze and _DISALLOWED.search(sql):
+    if analyze and _is_disallowed(sql):
         return [{"error": "EXPLAIN ANALYZE cannot be used with DML/DDL operations"}]
     
     try:
         explain_sql = f"EXPLAIN (FORMAT JSON, ANALYZE {analyze}, BUFFERS, VERBOSE) {sql}"
-        result = _fetch_all(explain_sql)
+        result = await _fetch_all(explain_sql, prepare=False)
         return result
     except Exception as e:
         return [{"error": f"EXPLAIN failed: {str(e)}"}]
@@ -2021,7 +2214,7 @@ def pg_explain_query(sql: str, analyze: bool = False) -> List[Dict[str, Any]]:
 # Export Operations
 # -----------------------------
 @mcp.tool()
-def pg_export_table_csv(schema: str, table: str, limit: int = 10000) -> str:
+async def pg_export_table_csv(schema: str, table: str, limit: int = 10000) -> str:
     """Export table data as CSV format (limited rows for safety)."""
     schema = (schema or "").strip()
     table = (table or "").strip()
@@ -2029,24 +2222,34 @@ def pg_export_table_csv(schema: str, table: str, limit: int = 10000) -> str:
         return "Error: schema and table are required"
     
     try:
-        rows = _fetch_all(f'SELECT * FROM "{schema}"."{table}" LIMIT %s', (limit,))
-        if not rows:
+        # The server formats the CSV; COPY takes no bind parameters, so the limit is a literal
+        output, rowcount = await _copy_out(
+            SQL("COPY (SELECT * FROM {} LIMIT {}) TO STDOUT WITH (FORMAT csv, HEADER)").format(
+                Identifier(schema, table), Literal(int(limit))
+            )
+        )
+        if not rowcount:
             return "No data found"
         
-        # Convert to CSV format
-        import io
-        import csv
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
-        
-        return output.getvalue()
+        return output
     except Exception as e:
         return f"Error: {str(e)}"
 
-@mcp.tool()
-def pg_backup_table_sql(schema: str, table: str) -> str:
+_BACKUP_COLUMNS_SQL = """
+    SELECT
+      column_name,
+      data_type,
+      is_nullable,
+      column_default,
+      is_generated,
+      generation_expression
+    FROM information_schema.columns
+    WHERE table_schema = %s AND table_name = %s
+    ORDER BY ordinal_position
+"""
+
+@mcp.tool()
+async def pg_backup_table_sql(schema: str, table: str) -> str:
     """
     Generate SQL dump of a table (structure + data).
     Returns SQL commands to recreate the table.
@@ -2058,13 +2261,18 @@ def pg_backup_table_sql(schema: str, table: str) -> str:
     
     try:
         # Get table structure
-        columns = pg_describe_table(schema, table)
-        
-        # Get constraints
-        constraints = pg_table_constraints(schema, table)
+        columns = await _fetch_all(_BACKUP_COLUMNS_SQL, (schema, table))
+        # Generated columns are recomputed on replay, so they are neither dumped nor loaded
+        stored = [col["column_name"] for col in columns if col["is_generated"] != "ALWAYS"]
         
-        # Get data
-        rows = _fetch_all(f'SELECT * FROM "{schema}"."{table}"')
+        # Get data in COPY text format (server-side quoting, correct for every type).
+        # COPY (SELECT ...) also covers partitioned tables, views and inheritance children.
+        data, rowcount = await _copy_out(
+            SQL("COPY (SELECT {} FROM {}) TO STDOUT").format(
+                SQL(", ").join(Identifier(c) for c in stored), Identifier(schema, table)
+            ),
+            lift_timeout=True,
+        )
         
         # Build CREATE TABLE statement
         col_defs = []
@@ -2072,7 +2280,9 @@ def pg_backup_table_sql(schema: str, table: str) -> str:
             col_def = f'  "{col["column_name"]}" {col["data_type"]}'
             if col["is_nullable"] == "NO":
                 col_def += " NOT NULL"
-            if col["column_default"]:
+            if col["is_generated"] == "ALWAYS":
+                col_def += f" GENERATED ALWAYS AS ({col['generation_expression']}) STORED"
+            elif col["column_default"]:
                 col_def += f" DEFAULT {col['column_default']}"
             col_defs.append(col_def)
         
@@ -2080,24 +2290,13 @@ def pg_backup_table_sql(schema: str, table: str) -> str:
         create_sql += ",\n".join(col_defs)
         create_sql += "\n);\n\n"
         
-        # Build INSERT statements
-        insert_sqls = []
-        if rows:
-            for row in rows:
-                values = []
-                for v in row.values():
-                    if v is None:
-                        values.append("NULL")
-                    elif isinstance(v, str):
-                        values.append(f"'{v.replace("'", "''")}'")
-                    else:
-                        values.append(str(v))
-                
-                cols = '", "'.join(row.keys())
-                vals = ", ".join(values)
-                insert_sqls.append(f'INSERT INTO "{schema}"."{table}" ("{cols}") VALUES ({vals});')
+        if not rowcount:
+            return create_sql
         
-        return create_sql + "\n".join(insert_sqls)
+        # COPY ... FROM stdin block, replayable with psql
+        cols = '", "'.join(stored)
+        copy_sql = f'COPY "{schema}"."{table}" ("{cols}") FROM stdin;\n{data}\\.\n'
+        return create_sql + copy_sql
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -2106,12 +2305,13 @@ def pg_backup_table_sql(schema: str, table: str) -> str:
 # System Information
 # -----------------------------
 @mcp.tool()
-def pg_server_settings(pattern: str = "") -> List[Dict[str, Any]]:
-    """List server settings, optionally filtered by pattern."""
+@_ttl_cache(60)
+async def pg_server_settings(pattern: str = "") -> List[Dict[str, Any]]:
+    """List server settings matching pattern, or all non-default settings if no pattern is given."""
     pattern = (pattern or "").strip()
     
     if pattern:
-        return _fetch_all(
+        return await _fetch_all(
             """
             SELECT name, setting, unit, category, short_desc
             FROM pg_settings
@@ -2121,19 +2321,20 @@ def pg_server_settings(pattern: str = "") -> List[Dict[str, Any]]:
             (f"%{pattern}%",)
         )
     else:
-        return _fetch_all(
+        return await _fetch_all(
             """
             SELECT name, setting, unit, category, short_desc
             FROM pg_settings
+            WHERE source != 'default'
             ORDER BY category, name
-            LIMIT 100
             """
         )
 
 @mcp.tool()
-def pg_extensions() -> List[Dict[str, Any]]:
+@_ttl_cache(60)
+async def pg_extensions() -> List[Dict[str, Any]]:
     """List installed extensions."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           extname AS extension,
@@ -2148,9 +2349,9 @@ def pg_extensions() -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_tablespaces() -> List[Dict[str, Any]]:
+async def pg_tablespaces() -> List[Dict[str, Any]]:
     """List available tablespaces."""
-    return _fetch_all(
+    return await _fetch_all(
         """
         SELECT
           spcname AS tablespace,
@@ -2162,18 +2363,33 @@ def pg_tablespaces() -> List[Dict[str, Any]]:
     )
 
 @mcp.tool()
-def pg_database_activity_summary() -> Dict[str, Any]:
+@_ttl_cache(PG_STATS_CACHE_SECONDS)
+async def pg_database_activity_summary() -> Dict[str, Any]:
     """Get overall database activity summary."""
-    return _fetch_one(
+    return await _fetch_one(
         """
+        WITH act AS (
+          SELECT
+            count(*) AS total_connections,
+            count(*) FILTER (WHERE state = 'active') AS active_queries,
+            count(*) FILTER (WHERE state = 'idle in transaction') AS idle_in_transaction
+          FROM pg_stat_activity
+        ), tbl AS (
+          SELECT
+            count(*) AS total_tables,
+            sum(n_live_tup) AS total_rows,
+            sum(n_dead_tup) AS dead_rows
+          FROM pg_stat_user_tables
+        )
         SELECT
-          (SELECT count(*) FROM pg_stat_activity) AS total_connections,
-          (SELECT count(*) FROM pg_stat_activity WHERE state = 'active') AS active_queries,
-          (SELECT count(*) FROM pg_stat_activity WHERE state = 'idle in transaction') AS idle_in_transaction,
-          (SELECT pg_size_pretty(pg_database_size(current_database()))) AS database_size,
-          (SELECT count(*) FROM pg_stat_user_tables) AS total_tables,
-          (SELECT sum(n_live_tup) FROM pg_stat_user_tables) AS total_rows,
-          (SELECT sum(n_dead_tup) FROM pg_stat_user_tables) AS dead_rows
+          act.total_connections,
+          act.active_queries,
+          act.idle_in_transaction,
+          pg_size_pretty(pg_database_size(current_database())) AS database_size,
+          tbl.total_tables,
+          tbl.total_rows,
+          tbl.dead_rows
+        FROM act, tbl
         """
     )
 